@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Benchmark de exports: linhas/segundo por formato.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_export [linhas]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench_export.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+from src.main import app  # noqa: E402
+from src.models.models import (  # noqa: E402
+    db, Maquina, Manutencao, TipoMaquinaEnum, TipoControleEnum,
+    TipoManutencaoEnum, CategoriaServicoEnum,
+)
+
+FORMATS = ["excel", "csv", "parquet"]
+
+
+def seed(n_rows, n_maquinas=50, oficina_id=1):
+    rnd = random.Random(42)
+    maquinas = [
+        Maquina(
+            tipo=TipoMaquinaEnum.MAQUINA,
+            numero_frota=f"F{i:04d}",
+            data_aquisicao=date(2020, 1, 1),
+            tipo_controle=TipoControleEnum.HORIMETRO,
+            nome=f"Máquina {i}",
+            oficina_id=oficina_id,
+        )
+        for i in range(n_maquinas)
+    ]
+    db.session.add_all(maquinas)
+    db.session.flush()
+    inicio = datetime(2020, 1, 1)
+    db.session.execute(
+        Manutencao.__table__.insert(),
+        [
+            {
+                "oficina_id": oficina_id,
+                "maquina_id": rnd.choice(maquinas).id,
+                "horimetro_hodometro": rnd.uniform(0, 10000),
+                "data_entrada": inicio + timedelta(hours=i),
+                "data_saida": inicio + timedelta(hours=i + 5),
+                "tipo_manutencao": rnd.choice(list(TipoManutencaoEnum)).name,
+                "categoria_servico": rnd.choice(list(CategoriaServicoEnum)).name,
+                "comentario": "troca de óleo e filtros",
+                "responsavel_servico": "Oficina",
+                "custo": rnd.uniform(50, 5000),
+            }
+            for i in range(n_rows)
+        ],
+    )
+    db.session.commit()
+
+
+def run(fmt, client, n_rows):
+    start = time.perf_counter()
+    resp = client.get(f"/export/manutencoes/{fmt}")
+    size = sum(len(chunk) for chunk in resp.response)
+    elapsed = time.perf_counter() - start
+    assert resp.status_code == 200, (fmt, resp.status_code)
+    return elapsed, size
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with app.app_context():
+        seed(n_rows)
+    client = app.test_client()
+    print(f"{'formato':<10}{'segundos':>10}{'linhas/s':>12}{'bytes':>12}")
+    for fmt in FORMATS:
+        elapsed, size = run(fmt, client, n_rows)
+        print(f"{fmt:<10}{elapsed:>10.3f}{n_rows / elapsed:>12.0f}{size:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Benchmark multi-oficina: latência das listagens de uma oficina conforme
+o número de oficinas no banco cresce (o volume por oficina é fixo).
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_tenancy [linhas_por_oficina]
+"""
+import sys
+import time
+
+from benchmarks.bench_export import app, seed  # noqa: F401 (configura o banco temporário)
+from src.models.models import db, Oficina
+
+OFICINAS = [1, 10, 50, 200]
+ENDPOINTS = ["/api/manutencoes", "/api/maquinas"]
+REPETICOES = 20
+
+
+def grow(total, n_rows):
+    existentes = db.session.query(Oficina).count()
+    for oficina_id in range(existentes + 1, total + 1):
+        db.session.add(Oficina(id=oficina_id, nome=f"Oficina {oficina_id}"))
+        db.session.flush()
+        seed(n_rows, n_maquinas=10, oficina_id=oficina_id)
+
+
+def measure(client, url, oficina_id):
+    headers = {"X-Oficina-Id": str(oficina_id)}
+    client.get(url, headers=headers)  # aquecimento
+    start = time.perf_counter()
+    for _ in range(REPETICOES):
+        resp = client.get(url, headers=headers)
+        assert resp.status_code == 200, (url, resp.status_code)
+    return (time.perf_counter() - start) / REPETICOES * 1000
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    client = app.test_client()
+    print(f"{'oficinas':>10}" + "".join(f"{url:>22}" for url in ENDPOINTS) + "   (ms por requisição)")
+    for total in OFICINAS:
+        with app.app_context():
+            # A oficina principal já existe (criada no startup) mas sem dados
+            if total == OFICINAS[0]:
+                seed(n_rows, n_maquinas=10, oficina_id=1)
+            grow(total, n_rows)
+        # Mede sempre a última oficina criada
+        tempos = [measure(client, url, total) for url in ENDPOINTS]
+        print(f"{total:>10}" + "".join(f"{t:>22.2f}" for t in tempos))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Benchmark dos schemas de validação: validações/segundo.
+
+Uso (a partir de backend/):
+    python -m benchmarks.bench_validation [repetições]
+"""
+import sys
+import time
+
+from src.schemas import MAQUINA, MANUTENCAO
+
+MANUTENCAO_OK = {
+    "maquina_id": 1,
+    "horimetro_hodometro": "1234.5",
+    "data_entrada": "2024-03-10T08:30:00Z",
+    "data_saida": "2024-03-11T17:00:00",
+    "tipo_manutencao": "preventiva",
+    "categoria_servico": "Filtros e lubrificantes",
+    "comentario": "troca de óleo",
+    "responsavel_servico": "Oficina",
+    "custo": 350,
+}
+
+MANUTENCAO_INVALIDA = {
+    "horimetro_hodometro": "abc",
+    "data_entrada": "10/03/2024",
+    "tipo_manutencao": "urgente",
+    "categoria_servico": "Outros",
+}
+
+MAQUINA_OK = {
+    "tipo": "máquina",
+    "numero_frota": "F-0001",
+    "data_aquisicao": "2020-01-15",
+    "tipo_controle": "horímetro",
+    "nome": "Trator",
+    "marca": "Valtra",
+}
+
+CASES = [
+    ("manutencao válida", MANUTENCAO, MANUTENCAO_OK),
+    ("manutencao inválida", MANUTENCAO, MANUTENCAO_INVALIDA),
+    ("maquina válida", MAQUINA, MAQUINA_OK),
+]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{'caso':<22}{'segundos':>10}{'validações/s':>15}")
+    for name, schema, payload in CASES:
+        validate = schema.validate
+        start = time.perf_counter()
+        for _ in range(n):
+            validate(payload)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<22}{elapsed:>10.3f}{n / elapsed:>15.0f}")
+
+
+if __name__ == "__main__":
+    main()
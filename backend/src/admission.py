@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Controle de admissão para rotas caras (exports, login).
+
+Cada limite tem ``max_concurrent`` vagas compartilhadas entre os workers
+do gunicorn: uma vaga é um arquivo de lock (flock) em ``ADMISSION_LOCK_DIR``.
+A fila também é compartilhada: sem vaga livre a requisição precisa de um
+dos ``max_queue`` lugares na fila (outros arquivos de lock) e espera até
+``timeout`` segundos; fila cheia devolve 429 e espera esgotada devolve
+503, ambos com ``Retry-After``. Quem espera ocupa uma thread do worker,
+por isso a imagem usa workers ``gthread``; com workers sync use
+``max_queue=0`` ou ``timeout=0`` (recusa imediata).
+"""
+import fcntl
+import logging
+import os
+import tempfile
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify, make_response, request
+
+POLL_INTERVAL = 0.05
+
+
+class Saturated(Exception):
+    def __init__(self, status, retry_after):
+        super().__init__(status)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Limiter:
+    def __init__(self, name, lock_dir, max_concurrent, max_queue, timeout, retry_after=None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after or max(1, int(timeout))
+        self.paths = [os.path.join(lock_dir, f"{name}-{i}.lock") for i in range(max_concurrent)]
+        self.queue_paths = [os.path.join(lock_dir, f"{name}-fila-{i}.lock") for i in range(max_queue)]
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.in_flight = 0
+        self.counters = {"admitted": 0, "queued": 0, "rejected": 0, "timed_out": 0}
+
+    @staticmethod
+    def _try_lock(paths):
+        for path in paths:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def _admit(self, fd):
+        with self._lock:
+            self.counters["admitted"] += 1
+            self.in_flight += 1
+        return fd
+
+    def _unlock(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    def acquire(self):
+        fd = self._try_lock(self.paths)
+        if fd is not None:
+            return self._admit(fd)
+
+        # Lugar na fila, contado entre todos os workers
+        queue_fd = self._try_lock(self.queue_paths) if self.timeout > 0 else None
+        if queue_fd is None:
+            with self._lock:
+                self.counters["rejected"] += 1
+            raise Saturated(429, self.retry_after)
+        with self._lock:
+            self.waiting += 1
+            self.counters["queued"] += 1
+        try:
+            deadline = time.monotonic() + self.timeout
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                fd = self._try_lock(self.paths)
+                if fd is not None:
+                    return self._admit(fd)
+        finally:
+            self._unlock(queue_fd)
+            with self._lock:
+                self.waiting -= 1
+
+        with self._lock:
+            self.counters["timed_out"] += 1
+        raise Saturated(503, self.retry_after)
+
+    def release(self, fd):
+        with self._lock:
+            self.in_flight -= 1
+        self._unlock(fd)
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self.counters,
+                "waiting": self.waiting,
+                "in_flight": self.in_flight,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "timeout": self.timeout,
+            }
+
+
+class AdmissionControl:
+    def __init__(self, app=None):
+        self.limiters = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        lock_dir = app.config.get("ADMISSION_LOCK_DIR") or os.path.join(
+            tempfile.gettempdir(), "oficina-admission"
+        )
+        os.makedirs(lock_dir, exist_ok=True)
+        for name, options in (app.config.get("ADMISSION_LIMITS") or {}).items():
+            self.limiters[name] = Limiter(name, lock_dir, **options)
+
+    def limit(self, name):
+        def decorator(f):
+            @wraps(f)
+            def wrapped(*args, **kwargs):
+                limiter = self.limiters.get(name)
+                if limiter is None or request.method == "OPTIONS":
+                    return f(*args, **kwargs)
+                try:
+                    fd = limiter.acquire()
+                except Saturated as e:
+                    logging.warning(f"Limite '{name}' saturado ({e.status}) para {request.path}")
+                    resp = jsonify({"message": "Servidor ocupado, tente novamente em instantes."})
+                    return resp, e.status, {"Retry-After": str(e.retry_after)}
+                try:
+                    resp = make_response(f(*args, **kwargs))
+                except BaseException:
+                    limiter.release(fd)
+                    raise
+                # Exports em streaming seguram a vaga até o fim do corpo; arquivos
+                # prontos (direct_passthrough) não passam por call_on_close
+                if resp.is_streamed and not resp.direct_passthrough:
+                    resp.call_on_close(lambda: limiter.release(fd))
+                else:
+                    limiter.release(fd)
+                return resp
+            return wrapped
+        return decorator
+
+    def stats(self):
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+admission = AdmissionControl()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Arquivo histórico de manutenções por ano.
+
+Anos fechados saem de ``manutencao`` para ``manutencao_arquivo`` (no
+Postgres, uma partição nativa por ano; no SQLite, uma tabela comum
+indexada por ``data_entrada``). As consultas usam ``manutencao_entity``:
+só quando o filtro de data alcança o período arquivado a tabela quente é
+unida ao arquivo, devolvendo objetos ``Manutencao`` normais.
+
+Para arquivar: ``flask --app src.main arquivar-manutencoes --ate 2023``.
+"""
+import logging
+from datetime import datetime
+
+import click
+from sqlalchemy import delete, func, insert, select, text, union_all
+from sqlalchemy.orm import aliased
+
+from src.models.models import db, Manutencao, ManutencaoArquivo
+
+
+def archive_boundary():
+    """Primeiro instante que ainda está na tabela quente (None se não há arquivo)."""
+    ultimo = db.session.execute(select(func.max(ManutencaoArquivo.data_entrada))).scalar()
+    if ultimo is None:
+        return None
+    return datetime(ultimo.year + 1, 1, 1)
+
+
+def needs_archive(start_date=None):
+    boundary = archive_boundary()
+    return boundary is not None and (start_date is None or start_date < boundary)
+
+
+def _historico():
+    hot = Manutencao.__table__
+    arq = ManutencaoArquivo.__table__
+    return union_all(
+        select(*hot.columns),
+        select(*[arq.c[c.name] for c in hot.columns]),
+    ).subquery("manutencao_historico")
+
+
+def manutencao_entity(start_date=None):
+    """Entidade para consultar manutenções a partir de ``start_date``."""
+    if not needs_archive(start_date):
+        return Manutencao
+    return aliased(Manutencao, _historico())
+
+
+def _ensure_partitions(connection, anos):
+    for ano in anos:
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS manutencao_arquivo_{ano} "
+            f"PARTITION OF manutencao_arquivo "
+            f"FOR VALUES FROM ('{ano}-01-01') TO ('{ano + 1}-01-01')"
+        ))
+
+
+def _sqlite_autoincrement(conn):
+    ddl = conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'manutencao'"
+    )).scalar()
+    return "AUTOINCREMENT" in (ddl or "").upper()
+
+
+def archive_until(ano):
+    """Move as manutenções com data_entrada até o fim de ``ano``. Retorna o total."""
+    cutoff = datetime(ano + 1, 1, 1)
+    hot = Manutencao.__table__
+    arq = ManutencaoArquivo.__table__
+    with db.engine.begin() as conn:
+        if conn.dialect.name == "sqlite" and not _sqlite_autoincrement(conn):
+            # Sem AUTOINCREMENT o SQLite reaproveita os maiores ids após o DELETE
+            raise RuntimeError(
+                "A tabela manutencao foi criada sem AUTOINCREMENT; recrie-a antes de arquivar."
+            )
+        primeiro = conn.execute(select(func.min(hot.c.data_entrada))).scalar()
+        if primeiro is None or primeiro >= cutoff:
+            return 0
+        if conn.dialect.name == "postgresql":
+            _ensure_partitions(conn, range(primeiro.year, ano + 1))
+        moved = select(*hot.columns).where(hot.c.data_entrada < cutoff)
+        conn.execute(insert(arq).from_select([c.name for c in hot.columns], moved))
+        total = conn.execute(delete(hot).where(hot.c.data_entrada < cutoff)).rowcount
+    logging.info(f"{total} manutenções arquivadas até {ano}")
+    return total
+
+
+def init_archive(app):
+    @app.cli.command("arquivar-manutencoes")
+    @click.option("--ate", "ano", type=int, default=lambda: datetime.now().year - 2,
+                  help="Último ano (inclusive) a mover para o arquivo.")
+    def arquivar_manutencoes(ano):
+        if ano >= datetime.now().year:
+            raise click.BadParameter("Só anos fechados podem ser arquivados.", param_hint="--ate")
+        db.create_all(bind_key=None)
+        try:
+            total = archive_until(ano)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"{total} manutenções movidas para o arquivo (até {ano}).")
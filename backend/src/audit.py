@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""Auditoria assíncrona das escritas em Maquina e Manutencao.
+
+Os diffs (antes/depois) são capturados por eventos da sessão no flush,
+liberados para o buffer do processo só após o commit e gravados em lote
+por uma thread em segundo plano. O buffer é limitado: se encher, novos
+registros são descartados (e contados) em vez de travar as requisições.
+No encerramento do processo o que restar é gravado.
+"""
+import atexit
+import enum
+import logging
+import os
+import queue
+import threading
+from datetime import date, datetime
+
+from flask import has_request_context, request
+from sqlalchemy import event, inspect, insert
+from sqlalchemy.orm import Session
+
+from src.models.models import db, Auditoria, Maquina, Manutencao
+
+AUDITED = (Maquina, Manutencao)
+
+
+def _json(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _usuario_id():
+    if not has_request_context():
+        return None
+    try:
+        return int(request.headers.get("X-User-Id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _diff(obj, acao):
+    state = inspect(obj)
+    alteracoes = {}
+    for attr in state.mapper.column_attrs:
+        hist = state.attrs[attr.key].history
+        if acao == "insert":
+            alteracoes[attr.key] = [None, _json(state.attrs[attr.key].value)]
+        elif acao == "delete":
+            antes = hist.unchanged or hist.deleted
+            alteracoes[attr.key] = [_json(antes[0]) if antes else None, None]
+        elif hist.has_changes():
+            antes = hist.deleted[0] if hist.deleted else None
+            depois = hist.added[0] if hist.added else None
+            if antes != depois:
+                alteracoes[attr.key] = [_json(antes), _json(depois)]
+    return alteracoes
+
+
+class AuditWriter:
+    def __init__(self, app=None):
+        self.engine = None
+        self.enabled = False
+        self.dropped = 0
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("AUDIT_ENABLED", True)
+        self.batch_size = app.config.get("AUDIT_BATCH_SIZE", 200)
+        self.flush_interval = app.config.get("AUDIT_FLUSH_INTERVAL", 2.0)
+        self._queue = queue.Queue(maxsize=app.config.get("AUDIT_BUFFER_SIZE", 10000))
+        with app.app_context():
+            self.engine = db.engine
+        atexit.register(self.shutdown)
+
+    def _ensure_thread(self):
+        # Workers do gunicorn (fork) precisam da própria thread
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, entries):
+        if not self.enabled or not entries:
+            return
+        self._ensure_thread()
+        dropped = 0
+        for entry in entries:
+            try:
+                self._queue.put_nowait(entry)
+            except queue.Full:
+                dropped += 1
+        if dropped:
+            self.dropped += dropped
+            logging.warning(f"Buffer de auditoria cheio; {self.dropped} registros descartados")
+
+    def _drain(self, first=None):
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(insert(Auditoria.__table__), batch)
+        except Exception:
+            logging.exception(f"Falha ao gravar {len(batch)} registros de auditoria")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._write(self._drain(first))
+        self.flush()
+
+    def flush(self):
+        """Grava tudo que está no buffer (bloqueante)."""
+        while True:
+            batch = self._drain()
+            if not batch:
+                return
+            self._write(batch)
+
+    def shutdown(self):
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._thread.join(timeout=10)
+        elif self._queue is not None:
+            self.flush()
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "buffered": self._queue.qsize() if self._queue is not None else 0,
+            "dropped": self.dropped,
+        }
+
+
+audit_writer = AuditWriter()
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    if not audit_writer.enabled:
+        return
+    agora = datetime.utcnow()
+    usuario_id = _usuario_id()
+    pending = session.info.setdefault("audit", [])
+    for acao, objs in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objs:
+            if not isinstance(obj, AUDITED):
+                continue
+            alteracoes = _diff(obj, acao)
+            if not alteracoes:
+                continue
+            pending.append({
+                "data": agora,
+                "oficina_id": obj.oficina_id,
+                "tabela": obj.__tablename__,
+                "registro_id": obj.id,
+                "acao": acao,
+                "usuario_id": usuario_id,
+                "alteracoes": alteracoes,
+            })
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    audit_writer.enqueue(session.info.pop("audit", None))
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("audit", None)
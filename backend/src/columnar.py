@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Leitura colunar de manutenções para exports analíticos (CSV/Parquet).
+
+As linhas saem do banco em blocos (sem instanciar objetos ORM) e viram
+RecordBatches do Arrow: enums como colunas dicionário e datas como
+timestamps de verdade.
+"""
+from io import BytesIO
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import select
+
+from src.models.models import db, Manutencao, Maquina, TipoManutencaoEnum, CategoriaServicoEnum
+
+CHUNK_SIZE = 5000
+
+_ENUMS = {
+    "tipo_manutencao": TipoManutencaoEnum,
+    "categoria_servico": CategoriaServicoEnum,
+}
+
+# Colunas de Manutencao vão por nome, resolvidas na entidade consultada
+# (tabela quente ou histórico com o arquivo, ver src/archive.py)
+COLUMNS = [
+    ("id", "id", pa.int64()),
+    ("maquina_id", "maquina_id", pa.int64()),
+    ("maquina_nome", Maquina.nome, pa.string()),
+    ("numero_frota", Maquina.numero_frota, pa.string()),
+    ("horimetro_hodometro", "horimetro_hodometro", pa.float64()),
+    ("data_entrada", "data_entrada", pa.timestamp("us")),
+    ("data_saida", "data_saida", pa.timestamp("us")),
+    ("tipo_manutencao", "tipo_manutencao", pa.dictionary(pa.int8(), pa.string())),
+    ("categoria_servico", "categoria_servico", pa.dictionary(pa.int8(), pa.string())),
+    ("categoria_outros_especificacao", "categoria_outros_especificacao", pa.string()),
+    ("comentario", "comentario", pa.string()),
+    ("responsavel_servico", "responsavel_servico", pa.string()),
+    ("custo", "custo", pa.float64()),
+]
+
+SCHEMA = pa.schema([(name, type_) for name, _, type_ in COLUMNS])
+
+# Dicionários pré-computados: membro do enum -> índice
+_DICTIONARIES = {
+    name: (
+        {member: i for i, member in enumerate(enum)},
+        pa.array([member.value for member in enum], pa.string()),
+    )
+    for name, enum in _ENUMS.items()
+}
+
+
+def columnar_select(where=(), entity=Manutencao):
+    cols = [getattr(entity, col) if isinstance(col, str) else col for _, col, _ in COLUMNS]
+    stmt = select(*cols).join(Maquina, entity.maquina_id == Maquina.id)
+    for criterion in where:
+        stmt = stmt.where(criterion)
+    return stmt.order_by(entity.data_entrada.desc())
+
+
+def _to_batch(rows):
+    arrays = []
+    for (name, _, type_), values in zip(COLUMNS, zip(*rows)):
+        if name in _DICTIONARIES:
+            index, dictionary = _DICTIONARIES[name]
+            indices = pa.array([index.get(v) for v in values], pa.int8())
+            arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+        else:
+            arrays.append(pa.array(values, type_))
+    return pa.RecordBatch.from_arrays(arrays, schema=SCHEMA)
+
+
+def iter_batches(stmt, chunk_size=CHUNK_SIZE):
+    result = db.session.execute(stmt.execution_options(yield_per=chunk_size))
+    for rows in result.partitions():
+        yield _to_batch(rows)
+
+
+def _drain(buf):
+    data = buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    return data
+
+
+def stream_csv(batches):
+    buf = BytesIO()
+    writer = pa_csv.CSVWriter(buf, SCHEMA)
+    yield _drain(buf)
+    for batch in batches:
+        writer.write_batch(batch)
+        yield _drain(buf)
+    writer.close()
+    yield _drain(buf)
+
+
+def stream_parquet(batches):
+    buf = BytesIO()
+    # Um row group por bloco lido do banco
+    writer = pq.ParquetWriter(buf, SCHEMA, compression="snappy")
+    for batch in batches:
+        writer.write_batch(batch)
+        yield _drain(buf)
+    writer.close()
+    yield _drain(buf)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Compressão gzip/brotli negociada para respostas da API e exports."""
+import zlib
+
+import brotli
+from flask import request
+
+ENCODINGS = ["br", "gzip"]
+
+
+def _gzip_compressor(level):
+    # wbits=31 -> cabeçalho/rodapé gzip
+    comp = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return comp.compress, comp.flush
+
+
+def _brotli_compressor(level):
+    comp = brotli.Compressor(quality=level)
+    return comp.process, comp.finish
+
+
+def _compressor(encoding, config):
+    if encoding == "br":
+        return _brotli_compressor(config["COMPRESS_LEVEL_BROTLI"])
+    return _gzip_compressor(config["COMPRESS_LEVEL_GZIP"])
+
+
+def _stream(chunks, encoding, config):
+    compress, finish = _compressor(encoding, config)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        out = compress(chunk)
+        if out:
+            yield out
+    yield finish()
+
+
+def _compressible(response, config):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if response.direct_passthrough or "Content-Encoding" in response.headers:
+        return False
+    if response.mimetype not in config["COMPRESS_MIMETYPES"]:
+        return False
+    return True
+
+
+def compress_response(response, config):
+    if not _compressible(response, config):
+        return response
+
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if not encoding:
+        response.vary.add("Accept-Encoding")
+        return response
+
+    if response.is_streamed:
+        # Tamanho desconhecido: comprime em fluxo, chunk a chunk
+        response.response = _stream(response.response, encoding, config)
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < config["COMPRESS_MIN_SIZE"]:
+            return response
+        compress, finish = _compressor(encoding, config)
+        response.set_data(compress(body) + finish())
+
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_compression(app):
+    @app.after_request
+    def _compress(response):
+        return compress_response(response, app.config)
@@ -2,4 +2,63 @@ import os
 
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Oficina usada quando a requisição não envia X-Oficina-Id (ver src/tenancy.py)
+    DEFAULT_OFICINA_ID = int(os.getenv("DEFAULT_OFICINA_ID", 1))
+
+    # Headers aceitos no CORS de /api e /export (inclui o da oficina)
+    CORS_ALLOW_HEADERS = "Content-Type,Authorization,X-User-Id,X-Oficina-Id"
+
+    # Réplica de leitura opcional (bind "replica", ver src/replica.py)
+    REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+    if REPLICA_DATABASE_URL and REPLICA_DATABASE_URL.startswith("postgres://"):
+        REPLICA_DATABASE_URL = REPLICA_DATABASE_URL.replace("postgres://", "postgresql://", 1)
+    # Timeout curto de conexão: réplica inacessível não pode segurar a requisição
+    REPLICA_CONNECT_TIMEOUT = int(os.getenv("REPLICA_CONNECT_TIMEOUT", 2))
+    SQLALCHEMY_BINDS = {}
+    if REPLICA_DATABASE_URL:
+        SQLALCHEMY_BINDS["replica"] = {"url": REPLICA_DATABASE_URL}
+        if REPLICA_DATABASE_URL.startswith("postgresql"):
+            SQLALCHEMY_BINDS["replica"]["connect_args"] = {"connect_timeout": REPLICA_CONNECT_TIMEOUT}
+    REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+    REPLICA_HEALTH_INTERVAL = int(os.getenv("REPLICA_HEALTH_INTERVAL", 10))
+
+    # Compressão de respostas (gzip/brotli negociado via Accept-Encoding)
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_LEVEL_GZIP = int(os.getenv("COMPRESS_LEVEL_GZIP", 6))
+    COMPRESS_LEVEL_BROTLI = int(os.getenv("COMPRESS_LEVEL_BROTLI", 5))
+    # xlsx já é um zip e o PDF gerado já tem streams comprimidos: recomprimir só gasta CPU
+    COMPRESS_MIMETYPES = {
+        "application/json",
+        "text/csv",
+        "text/html",
+        "text/plain",
+    }
+
+    # Cache em disco dos exports Excel/PDF (LRU por tamanho)
+    EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR")
+    EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+    # Controle de admissão: vagas e fila compartilhadas entre workers (ver src/admission.py).
+    # A espera na fila ocupa uma thread: os valores abaixo supõem workers gthread
+    # (Dockerfile). Com workers sync, defina *_MAX_QUEUE=0 para recusar na hora.
+    ADMISSION_LOCK_DIR = os.getenv("ADMISSION_LOCK_DIR")
+    ADMISSION_LIMITS = {
+        "export": {
+            "max_concurrent": int(os.getenv("EXPORT_MAX_CONCURRENT", 2)),
+            "max_queue": int(os.getenv("EXPORT_MAX_QUEUE", 4)),
+            "timeout": float(os.getenv("EXPORT_QUEUE_TIMEOUT", 15)),
+        },
+        "login": {
+            "max_concurrent": int(os.getenv("LOGIN_MAX_CONCURRENT", 4)),
+            "max_queue": int(os.getenv("LOGIN_MAX_QUEUE", 16)),
+            "timeout": float(os.getenv("LOGIN_QUEUE_TIMEOUT", 5)),
+        },
+    }
+
+    # Auditoria assíncrona das escritas (ver src/audit.py)
+    AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "1") == "1"
+    AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", 10000))
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 200))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 2.0))
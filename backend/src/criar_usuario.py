@@ -6,6 +6,7 @@ from werkzeug.security import generate_password_hash
 username = "admin"
 senha = "1234"
 role = RoleEnum.GESTOR
+oficina_id = 1
 
 with app.app_context():
     senha_hash = generate_password_hash(senha)
@@ -18,7 +19,8 @@ with app.app_context():
         novo_usuario = Usuario(
             username=username,
             password_hash=senha_hash,
-            role=role
+            role=role,
+            oficina_id=oficina_id
         )
         db.session.add(novo_usuario)
         db.session.commit()
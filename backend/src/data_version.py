@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Versão de dados por tabela e oficina, compartilhada entre workers via banco.
+
+Toda escrita ORM que de fato altera uma tabela rastreada incrementa
+``versao_tabela`` da oficina do registro logo após o commit, em uma
+transação curta própria: a linha de versão não fica travada durante a
+transação de quem escreve. Caches derivados usam as versões na chave e
+podem registrar callbacks para descartar entradas após o incremento;
+escritas de uma oficina não invalidam caches das outras.
+"""
+import logging
+
+from sqlalchemy import event, select, update, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.models.models import db, VersaoTabela
+from src.tenancy import current_oficina_id
+
+TRACKED_TABLES = {"maquina", "manutencao"}
+
+_listeners = []
+
+
+def on_change(fn):
+    """Registra ``fn(alteracoes)`` para após o commit; recebe pares (tabela, oficina_id)."""
+    _listeners.append(fn)
+    return fn
+
+
+def get_versions(session, tables, oficina_id=None):
+    if oficina_id is None:
+        oficina_id = current_oficina_id() or 0
+    rows = session.execute(
+        select(VersaoTabela.tabela, VersaoTabela.versao).where(
+            VersaoTabela.oficina_id == oficina_id,
+            VersaoTabela.tabela.in_(tables),
+        )
+    ).all()
+    versions = dict.fromkeys(tables, 0)
+    versions.update(rows)
+    return versions
+
+
+def _changed_tables(session):
+    changes = set()
+    # dirty inclui objetos só "tocados"; is_modified descarta PUTs sem alteração
+    dirty = (obj for obj in session.dirty if session.is_modified(obj))
+    for obj in (*session.new, *dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table in TRACKED_TABLES:
+            oficina_id = getattr(obj, "oficina_id", None) or current_oficina_id() or 0
+            changes.add((table, oficina_id))
+    return changes
+
+
+def _increment(engine, table, oficina_id):
+    stmt = (
+        update(VersaoTabela.__table__)
+        .where(VersaoTabela.tabela == table, VersaoTabela.oficina_id == oficina_id)
+        .values(versao=VersaoTabela.versao + 1)
+    )
+    with engine.begin() as conn:
+        if conn.execute(stmt).rowcount:
+            return
+    try:
+        with engine.begin() as conn:
+            conn.execute(insert(VersaoTabela.__table__).values(tabela=table, oficina_id=oficina_id, versao=1))
+    except IntegrityError:
+        # Outro worker criou a linha ao mesmo tempo
+        with engine.begin() as conn:
+            conn.execute(stmt)
+
+
+def _bump(engine, changes):
+    for table, oficina_id in sorted(changes):
+        try:
+            _increment(engine, table, oficina_id)
+        except Exception:
+            logging.exception(f"Falha ao incrementar versão de {table} (oficina {oficina_id})")
+
+
+@event.listens_for(Session, "before_flush")
+def _before_flush(session, flush_context, instances):
+    changes = _changed_tables(session)
+    if changes:
+        session.info.setdefault("changed_tables", set()).update(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    changes = session.info.pop("changed_tables", None)
+    if changes:
+        # Sempre no primário, fora da transação que acabou de fechar
+        _bump(db.engine, changes)
+        for fn in _listeners:
+            fn(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("changed_tables", None)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Cache em disco dos exports (Excel/PDF).
+
+A chave combina oficina, formato, filtros já validados e a versão de dados
+das tabelas envolvidas (na oficina), então qualquer escrita em
+``Maquina``/``Manutencao`` torna as entradas antigas daquela oficina
+inalcançáveis; o callback de commit ainda as apaga para liberar espaço.
+O tamanho total é limitado com despejo LRU (mtime do arquivo, atualizado
+a cada hit, vale entre workers).
+"""
+import enum
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+from src import data_version
+from src.models.models import db
+from src.tenancy import current_oficina_id
+
+# Tabelas lidas por cada formato de export
+DEPENDENCIES = {
+    "excel": ("manutencao", "maquina"),
+    "pdf": ("manutencao", "maquina"),
+}
+
+
+def _key_value(value):
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class ExportCache:
+    def __init__(self, app=None):
+        self.directory = None
+        self.max_bytes = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config.get("EXPORT_CACHE_DIR") or os.path.join(
+            tempfile.gettempdir(), "oficina-export-cache"
+        )
+        self.max_bytes = app.config.get("EXPORT_CACHE_MAX_BYTES", 200 * 1024 * 1024)
+        os.makedirs(self.directory, exist_ok=True)
+        data_version.on_change(self.invalidate)
+
+    def key(self, fmt, filters):
+        """``filters`` são os valores já convertidos que a consulta vai usar."""
+        oficina_id = current_oficina_id() or 0
+        versions = data_version.get_versions(db.session, DEPENDENCIES[fmt], oficina_id)
+        filters = {name: _key_value(value) for name, value in filters.items()}
+        payload = json.dumps([fmt, filters, versions], sort_keys=True)
+        return f"o{oficina_id}-{fmt}-{hashlib.sha256(payload.encode()).hexdigest()[:32]}"
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, data):
+        path = self.path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self._evict()
+        return path
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.startswith(".tmp-") or not entry.is_file():
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def invalidate(self, changes):
+        prefixes = tuple(
+            f"o{oficina_id}-{fmt}-"
+            for table, oficina_id in changes
+            for fmt, deps in DEPENDENCIES.items()
+            if table in deps
+        )
+        if not prefixes:
+            return
+        for _, _, path in self._entries():
+            if os.path.basename(path).startswith(prefixes):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        logging.info(f"Cache de exports invalidado para {sorted(changes)}")
+
+
+export_cache = ExportCache()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Importação de manutenções a partir de planilhas (CSV/XLSX).
+
+As colunas devem ter os nomes dos campos do payload da API; cada linha
+passa pelo mesmo schema de ``POST /api/manutencoes``. Se alguma linha for
+inválida nada é gravado.
+
+Uso: ``flask --app src.main importar-manutencoes planilha.xlsx --oficina 1``
+"""
+import click
+import pandas as pd
+
+from src.models.models import db, Manutencao
+from src.schemas import MANUTENCAO, validate_manutencoes
+
+MAX_ERROS_EXIBIDOS = 20
+
+
+def read_rows(path):
+    if path.lower().endswith(".csv"):
+        df = pd.read_csv(path, dtype=str)
+    else:
+        df = pd.read_excel(path)
+    df = df[[c for c in df.columns if c in MANUTENCAO.fields]]
+    # Células vazias viram None para o schema tratar como ausentes
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict("records")
+
+
+def import_manutencoes(rows, oficina_id, chunk_size=500):
+    """Valida todas as linhas e grava em blocos. Retorna (total, erros por linha)."""
+    # Fora de requisição não há filtro automático: restringe as máquinas à oficina
+    results = validate_manutencoes(rows, oficina_id=oficina_id)
+    # +2: cabeçalho e numeração a partir de 1, como na planilha
+    errors = {i + 2: errs for i, (_, errs) in enumerate(results) if errs}
+    if errors:
+        return 0, errors
+    # INSERTs enviados em blocos, mas um único commit: tudo ou nada
+    try:
+        for start in range(0, len(results), chunk_size):
+            db.session.add_all(
+                Manutencao(oficina_id=oficina_id, **values) for values, _ in results[start:start + chunk_size]
+            )
+            db.session.flush()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(results), {}
+
+
+def init_importer(app):
+    @app.cli.command("importar-manutencoes")
+    @click.argument("arquivo", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--oficina", "oficina_id", type=int, default=lambda: app.config.get("DEFAULT_OFICINA_ID", 1),
+                  help="Oficina dona das manutenções importadas.")
+    def importar_manutencoes(arquivo, oficina_id):
+        total, errors = import_manutencoes(read_rows(arquivo), oficina_id)
+        if errors:
+            for linha, errs in list(errors.items())[:MAX_ERROS_EXIBIDOS]:
+                click.echo(f"Linha {linha}: {'; '.join(errs.values())}", err=True)
+            raise click.ClickException(f"{len(errors)} linhas inválidas; nada foi importado.")
+        click.echo(f"{total} manutenções importadas.")
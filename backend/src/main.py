@@ -1,13 +1,23 @@
 import os
 import sys
 import logging
-from flask import Flask, request, make_response, send_from_directory
+from flask import Flask, request, make_response
 from src.config import Config
+from src.compression import init_compression
+from src.export_cache import export_cache
+from src.admission import admission
+from src.archive import init_archive
+from src.importer import init_importer
+from src.audit import audit_writer
+from src.tenancy import init_tenancy, ensure_default_oficina
+from src.static_assets import build_manifest, serve_asset
 from src.models.models import db
+from src.replica import ReplicaRouter
 from src.routes.auth import auth_bp
 from src.routes.maquinas import maquinas_bp
 from src.routes.manutencoes import manutencoes_bp
 from src.routes.export import export_bp
+from src.routes.auditoria import auditoria_bp
 
 # PYTHONPATH
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -20,11 +30,9 @@ ALLOWED_ORIGINS = {
     "https://laufoficina-ranieljrs-projects.vercel.app"
 }
 
-app = Flask(
-    __name__,
-    static_folder=os.path.join(os.path.dirname(__file__), 'static'),
-    static_url_path=""
-)
+# Sem a rota static do Flask: serve_react atende todos os caminhos a partir do manifesto
+STATIC_FOLDER = os.path.join(os.path.dirname(__file__), 'static')
+app = Flask(__name__, static_folder=None)
 
 # Carrega Config
 app.config.from_object(Config)
@@ -42,16 +50,31 @@ if database_url and database_url.startswith("postgres://"):
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
+init_tenancy(app)
+ReplicaRouter(db, app)
+export_cache.init_app(app)
+admission.init_app(app)
+init_archive(app)
+init_importer(app)
+audit_writer.init_app(app)
 
 # Blueprints
 app.register_blueprint(auth_bp, url_prefix='/api/auth')
 app.register_blueprint(maquinas_bp, url_prefix='/api')
 app.register_blueprint(manutencoes_bp, url_prefix='/api')
 app.register_blueprint(export_bp, url_prefix='/export')
+app.register_blueprint(auditoria_bp, url_prefix='/api')
+
+# Compressão gzip/brotli das respostas da API e exports
+init_compression(app)
+
+# Manifesto dos assets do front-end (montado uma vez no startup)
+STATIC_MANIFEST = build_manifest(STATIC_FOLDER)
 
 # Cria tabelas (dev)
 with app.app_context():
-    db.create_all()
+    db.create_all(bind_key=None)  # a réplica recebe o schema por replicação
+    ensure_default_oficina(app.config['DEFAULT_OFICINA_ID'])
     logging.info("Tabelas criadas com sucesso!")
 
 # Healthcheck e front-end
@@ -59,13 +82,24 @@ with app.app_context():
 def health():
     return {"status": "ok"}, 200
 
+# Contadores do controle de admissão (por worker)
+@app.route('/health/limits', methods=['GET'])
+def health_limits():
+    return admission.stats(), 200
+
+# Estado do buffer de auditoria (por worker)
+@app.route('/health/audit', methods=['GET'])
+def health_audit():
+    return audit_writer.stats(), 200
+
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve_react(path):
-    full = os.path.join(app.static_folder, path)
-    if path and os.path.exists(full):
-        return send_from_directory(app.static_folder, path)
-    return send_from_directory(app.static_folder, 'index.html')
+    # Caminhos desconhecidos são rotas do SPA: devolve o index.html
+    asset = STATIC_MANIFEST.get(path) or STATIC_MANIFEST.get('index.html')
+    if asset is None:
+        return {"message": "Front-end não encontrado"}, 404
+    return serve_asset(asset)
 
 # 1) Lida com preflight CORS para qualquer rota /api/*
 @app.route('/api/<path:any>', methods=['OPTIONS'])
@@ -77,7 +111,7 @@ def preflight(any):
         resp.headers['Access-Control-Allow-Origin'] = origin
         resp.headers['Access-Control-Allow-Credentials'] = 'true'
         resp.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
-        resp.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
+        resp.headers['Access-Control-Allow-Headers'] = app.config['CORS_ALLOW_HEADERS']
     return resp
 
 # 2) Adiciona header CORS em todas as respostas de /api/*
@@ -88,7 +122,10 @@ def add_cors(response):
         response.headers['Access-Control-Allow-Origin'] = origin
         response.headers['Access-Control-Allow-Credentials'] = 'true'
         response.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
+        response.headers['Access-Control-Allow-Headers'] = app.config['CORS_ALLOW_HEADERS']
+    # Respostas "private" (exports em cache) controlam a própria revalidação
+    if response.cache_control.private:
+        return response
     # mantém seu disable_caching se quiser
     response.headers.pop("ETag", None)
     response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
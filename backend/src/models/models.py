@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import Enum
+from sqlalchemy import Enum, Index, UniqueConstraint
+from sqlalchemy.orm import declared_attr
 import enum
+from src.replica import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 class TipoMaquinaEnum(enum.Enum):
     MAQUINA = "máquina"
@@ -37,13 +39,26 @@ class RoleEnum(enum.Enum):
     MECANICO = "mecanico"
     ADMINISTRADOR = "administrador"
 
-class Maquina(db.Model):
+class Oficina(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nome = db.Column(db.String(100), unique=True, nullable=False)
+
+class TenantMixin:
+    # Toda consulta ORM é filtrada pela oficina da requisição (ver src/tenancy.py)
+    @declared_attr
+    def oficina_id(cls):
+        return db.Column(db.Integer, db.ForeignKey('oficina.id'), nullable=False)
+
+class Maquina(TenantMixin, db.Model):
+    __table_args__ = (
+        UniqueConstraint('oficina_id', 'numero_frota', name='uq_maquina_oficina_frota'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     tipo = db.Column(
         Enum(TipoMaquinaEnum), 
         nullable=False
     )
-    numero_frota = db.Column(db.String(50), unique=True, nullable=False)
+    numero_frota = db.Column(db.String(50), nullable=False)
     data_aquisicao = db.Column(db.Date, nullable=False)
     tipo_controle = db.Column(
         Enum(TipoControleEnum), 
@@ -58,11 +73,17 @@ class Maquina(db.Model):
     )
     manutencoes = db.relationship('Manutencao', backref='maquina', lazy=True)
 
-class Manutencao(db.Model):
+class Manutencao(TenantMixin, db.Model):
+    __table_args__ = (
+        Index('ix_manutencao_oficina_data', 'oficina_id', 'data_entrada'),
+        Index('ix_manutencao_oficina_maquina_data', 'oficina_id', 'maquina_id', 'data_entrada'),
+        # Ids arquivados não podem voltar a ser usados (o histórico une as duas tabelas)
+        {'sqlite_autoincrement': True},
+    )
     id = db.Column(db.Integer, primary_key=True)
     maquina_id = db.Column(db.Integer, db.ForeignKey('maquina.id'), nullable=False)
     horimetro_hodometro = db.Column(db.Float, nullable=False)
-    data_entrada = db.Column(db.DateTime, nullable=False)
+    data_entrada = db.Column(db.DateTime, nullable=False, index=True)
     data_saida = db.Column(db.DateTime)
     tipo_manutencao = db.Column(
         Enum(TipoManutencaoEnum), 
@@ -77,7 +98,31 @@ class Manutencao(db.Model):
     responsavel_servico = db.Column(db.String(100), nullable=False)
     custo = db.Column(db.Float) # Campo simples para custo
 
-class Usuario(db.Model):
+class ManutencaoArquivo(TenantMixin, db.Model):
+    # Anos fechados de Manutencao (ver src/archive.py). Mesmas colunas, na mesma
+    # ordem; no Postgres a tabela é particionada por ano de data_entrada.
+    __tablename__ = 'manutencao_arquivo'
+    __table_args__ = (
+        Index('ix_manutencao_arquivo_oficina_data', 'oficina_id', 'data_entrada'),
+        {'postgresql_partition_by': 'RANGE (data_entrada)'},
+    )
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    maquina_id = db.Column(db.Integer, db.ForeignKey('maquina.id'), nullable=False)
+    horimetro_hodometro = db.Column(db.Float, nullable=False)
+    # Chave de partição precisa fazer parte da PK no Postgres
+    data_entrada = db.Column(db.DateTime, primary_key=True)
+    data_saida = db.Column(db.DateTime)
+    tipo_manutencao = db.Column(Enum(TipoManutencaoEnum), nullable=False)
+    categoria_servico = db.Column(Enum(CategoriaServicoEnum), nullable=False)
+    categoria_outros_especificacao = db.Column(db.String(255))
+    comentario = db.Column(db.Text)
+    responsavel_servico = db.Column(db.String(100), nullable=False)
+    custo = db.Column(db.Float)
+
+class Usuario(TenantMixin, db.Model):
+    __table_args__ = (
+        Index('ix_usuario_oficina', 'oficina_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False) # Armazenar hash da senha
@@ -89,3 +134,24 @@ class Usuario(db.Model):
     def __repr__(self):
         return f'<Usuario {self.username}>'
 
+class Auditoria(TenantMixin, db.Model):
+    # Gravado em lote por src/audit.py; consultado por tabela/registro ou período
+    __table_args__ = (
+        Index('ix_auditoria_oficina_id', 'oficina_id', 'id'),
+        Index('ix_auditoria_oficina_tabela_registro', 'oficina_id', 'tabela', 'registro_id', 'id'),
+        Index('ix_auditoria_oficina_data', 'oficina_id', 'data'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    data = db.Column(db.DateTime, nullable=False)
+    tabela = db.Column(db.String(64), nullable=False)
+    registro_id = db.Column(db.Integer)
+    acao = db.Column(db.String(10), nullable=False) # insert, update, delete
+    usuario_id = db.Column(db.Integer)
+    alteracoes = db.Column(db.JSON, nullable=False) # {campo: [antes, depois]}
+
+class VersaoTabela(db.Model):
+    # Contador incrementado a cada escrita na tabela, por oficina (ver src/data_version.py)
+    tabela = db.Column(db.String(64), primary_key=True)
+    oficina_id = db.Column(db.Integer, primary_key=True, default=0)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+
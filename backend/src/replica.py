@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Roteamento de leituras para a réplica (bind ``replica``).
+
+Requisições GET/HEAD usam a réplica quando ela está configurada e
+saudável. Depois de uma escrita, o cliente recebe um cookie que o mantém
+no primário por ``REPLICA_STICKY_SECONDS`` (read-your-writes), válido em
+qualquer worker. Falhas de conexão marcam a réplica como indisponível:
+a leitura em andamento é refeita uma vez no primário e as seguintes vão
+direto para ele até o próximo health check, que roda em uma thread de
+fundo (nunca no caminho da requisição).
+
+Para testar localmente com SQLite::
+
+    DATABASE_URL=sqlite:////tmp/primario.db
+    REPLICA_DATABASE_URL=sqlite:////tmp/replica.db  # cópia do primário
+"""
+import logging
+import threading
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+REPLICA_BIND = "replica"
+STICKY_COOKIE = "primary_until"
+SAFE_METHODS = {"GET", "HEAD"}
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get("use_replica"):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        try:
+            return super().execute(*args, **kwargs)
+        except DBAPIError:
+            # Réplica caiu durante esta requisição: refaz a leitura no primário
+            if not (has_request_context() and g.pop("replica_failed", False)):
+                raise
+            g.use_replica = False
+            self.rollback()
+            return super().execute(*args, **kwargs)
+
+
+class ReplicaRouter:
+    def __init__(self, db=None, app=None):
+        self.db = db
+        self.enabled = False
+        self.healthy = True
+        self.checked_at = 0.0
+        self.engine = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = REPLICA_BIND in (app.config.get("SQLALCHEMY_BINDS") or {})
+        self.sticky_seconds = app.config.get("REPLICA_STICKY_SECONDS", 5)
+        self.health_interval = app.config.get("REPLICA_HEALTH_INTERVAL", 10)
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            self.engine = self.db.engines[REPLICA_BIND]
+        event.listen(self.engine, "handle_error", self._on_error)
+
+        app.before_request(self._route)
+        app.after_request(self._stick)
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            logging.warning("Réplica indisponível; leituras voltam ao primário")
+            self.healthy = False
+            self.checked_at = time.monotonic()
+            if has_request_context() and g.get("use_replica"):
+                g.replica_failed = True
+
+    def _check(self):
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            healthy = True
+        except Exception as e:
+            logging.warning(f"Health check da réplica falhou: {e}")
+            healthy = False
+        finally:
+            self._lock.release()
+        self.healthy = healthy
+        self.checked_at = time.monotonic()
+
+    def is_healthy(self):
+        # Devolve o último estado conhecido; a verificação vencida roda em segundo plano
+        if time.monotonic() - self.checked_at >= self.health_interval and self._lock.acquire(blocking=False):
+            threading.Thread(target=self._check, daemon=True, name="replica-health").start()
+        return self.healthy
+
+    def _route(self):
+        try:
+            primary_until = float(request.cookies.get(STICKY_COOKIE, 0))
+        except ValueError:
+            primary_until = 0
+        g.use_replica = (
+            request.method in SAFE_METHODS
+            and primary_until < time.time()
+            and self.is_healthy()
+        )
+
+    def _stick(self, response):
+        if request.method not in SAFE_METHODS and request.method != "OPTIONS" and response.status_code < 400:
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(time.time() + self.sticky_seconds),
+                max_age=self.sticky_seconds,
+                httponly=True,
+                secure=request.is_secure,
+                samesite="None" if request.is_secure else "Lax",
+            )
+        return response
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from flask import Blueprint, request, jsonify
+from src.models.models import Auditoria
+from src.routes.export import role_required
+from datetime import datetime
+import logging
+
+auditoria_bp = Blueprint("auditoria_bp", __name__)
+
+MAX_POR_PAGINA = 200
+
+# Consulta paginada da auditoria (mais recentes primeiro).
+# Paginação por cursor: envie "antes_de" = next_cursor da página anterior.
+@auditoria_bp.route("/auditoria", methods=["GET"])
+@role_required("gestor")
+def get_auditoria():
+    try:
+        por_pagina = max(1, min(int(request.args.get("por_pagina", 50)), MAX_POR_PAGINA))
+        if "registro_id" in request.args and "tabela" not in request.args:
+            return jsonify({"message": "Filtro inválido: registro_id exige tabela"}), 400
+        query = Auditoria.query
+        if "tabela" in request.args:
+            query = query.filter(Auditoria.tabela == request.args.get("tabela"))
+        if "registro_id" in request.args:
+            query = query.filter(Auditoria.registro_id == int(request.args.get("registro_id")))
+        if "usuario_id" in request.args:
+            query = query.filter(Auditoria.usuario_id == int(request.args.get("usuario_id")))
+        if "desde" in request.args:
+            query = query.filter(Auditoria.data >= datetime.fromisoformat(request.args.get("desde")))
+        if "ate" in request.args:
+            query = query.filter(Auditoria.data <= datetime.fromisoformat(request.args.get("ate")))
+        if "antes_de" in request.args:
+            query = query.filter(Auditoria.id < int(request.args.get("antes_de")))
+    except ValueError as e:
+        return jsonify({"message": f"Filtro inválido: {e}"}), 400
+
+    try:
+        registros = query.order_by(Auditoria.id.desc()).limit(por_pagina + 1).all()
+        proxima = registros[por_pagina - 1].id if len(registros) > por_pagina else None
+        return jsonify({
+            "itens": [
+                {
+                    "id": a.id,
+                    "data": a.data.isoformat(),
+                    "tabela": a.tabela,
+                    "registro_id": a.registro_id,
+                    "acao": a.acao,
+                    "usuario_id": a.usuario_id,
+                    "alteracoes": a.alteracoes,
+                }
+                for a in registros[:por_pagina]
+            ],
+            "next_cursor": proxima,
+        }), 200
+    except Exception:
+        logging.exception("Erro ao buscar auditoria")
+        return jsonify({"message": "Erro ao buscar auditoria"}), 500
@@ -6,6 +6,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 # TODO: Implement JWT or Flask-Login for session management
 # from flask_login import login_user, logout_user, login_required, current_user
 from src.models.models import db, Usuario, RoleEnum
+from src.admission import admission
 
 import logging
 
@@ -23,6 +24,7 @@ logging.basicConfig(level=logging.INFO)
 
 # Rota de Login
 @auth_bp.route("/login", methods=["OPTIONS", "POST"])
+@admission.limit("login")
 def login():
     # Responde à preflight
     if request.method == "OPTIONS":
@@ -47,7 +49,8 @@ def login():
             logging.warning("Nome de usuário ou senha ausentes na requisição")
             return jsonify({"message": "Nome de usuário e senha são obrigatórios"}), 400
 
-        user = Usuario.query.filter_by(username=username).first()
+        # Login ainda não sabe a oficina: procura em todas
+        user = Usuario.query.execution_options(todas_oficinas=True).filter_by(username=username).first()
 
         if not user:
             logging.warning(f"Usuário '{username}' não encontrado no banco de dados")
@@ -60,7 +63,8 @@ def login():
 
         # TODO: Gerar token JWT ou usar flask_login.login_user(user)
         logging.info(f"Login bem-sucedido para usuário: {username}")
-        return jsonify({"message": "Login bem-sucedido", "user_id": user.id, "role": user.role.value}), 200
+        return jsonify({"message": "Login bem-sucedido", "user_id": user.id, "role": user.role.value,
+                        "oficina_id": user.oficina_id}), 200
     except Exception as e:
         logging.error(f"Erro inesperado durante o login: {e}", exc_info=True)
         return jsonify({"message": "Erro interno no servidor"}), 500
@@ -82,7 +86,8 @@ def register():
     if not username or not password:
         return jsonify({'message': 'Nome de usuário e senha são obrigatórios'}), 400
 
-    if Usuario.query.filter_by(username=username).first():
+    # username é único entre todas as oficinas
+    if Usuario.query.execution_options(todas_oficinas=True).filter_by(username=username).first():
         return jsonify({'message': 'Nome de usuário já existe'}), 409
 
     try:
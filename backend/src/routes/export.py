@@ -1,9 +1,14 @@
-from flask import Blueprint, Response, request, jsonify, send_file, current_app, make_response
+from flask import Blueprint, Response, request, jsonify, send_file, current_app, make_response, stream_with_context
 from io import BytesIO
 from datetime import datetime
 import xlsxwriter
+import pdfkit
 from functools import wraps
-from src.models.models import Maquina, Manutencao, TipoManutencaoEnum, CategoriaServicoEnum
+from src.models.models import db, Maquina, Manutencao, TipoManutencaoEnum, CategoriaServicoEnum
+from src.admission import admission
+from src.archive import manutencao_entity
+from src.export_cache import export_cache
+from src.columnar import columnar_select, iter_batches, stream_csv, stream_parquet
 
 # Blueprint configurado em '/export'
 export_bp = Blueprint("export_bp", __name__)
@@ -13,7 +18,7 @@ def add_cors_headers(response):
     # Aplica CORS em todas as respostas do blueprint
     response.headers["Access-Control-Allow-Origin"] = "https://laufoficina.vercel.app"
     response.headers["Access-Control-Allow-Methods"] = "GET,POST,OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type,Authorization"
+    response.headers["Access-Control-Allow-Headers"] = current_app.config["CORS_ALLOW_HEADERS"]
     return response
 
 # Decorator de roles
@@ -28,71 +33,150 @@ def role_required(roles):
         return wrapper
     return decorator
 
-# Função de filtros (implemente conforme sua lógica)
-def _get_filtered_manutencoes(args):
-    return Manutencao.query.all()
-    # Exemplo:
-    # return Manutencao.query.filter_by(...).all()
+# Filtros aceitos pelos exports (mesmos de GET /api/manutencoes).
+# Convertidos uma única vez: a chave do cache e a consulta usam os mesmos valores.
+def _parse_filters(args):
+    filters = {}
+    if "maquina_id" in args:
+        filters["maquina_id"] = int(args.get("maquina_id"))
+    if "tipo_manutencao" in args:
+        filters["tipo_manutencao"] = TipoManutencaoEnum(args.get("tipo_manutencao"))
+    if "start_date" in args and "end_date" in args:
+        filters["start_date"] = datetime.fromisoformat(args.get("start_date"))
+        filters["end_date"] = datetime.fromisoformat(args.get("end_date"))
+    return filters
+
+def _filter_criteria(filters, entity=Manutencao):
+    criteria = []
+    if "maquina_id" in filters:
+        criteria.append(entity.maquina_id == filters["maquina_id"])
+    if "tipo_manutencao" in filters:
+        criteria.append(entity.tipo_manutencao == filters["tipo_manutencao"])
+    if "start_date" in filters:
+        criteria.append(entity.data_entrada.between(filters["start_date"], filters["end_date"]))
+    return criteria
+
+def _get_filtered_manutencoes(filters):
+    # Só une o arquivo histórico quando o período pedido chega nele
+    entity = manutencao_entity(filters.get("start_date"))
+    return db.session.query(entity).filter(*_filter_criteria(filters, entity)).all()
+
+def _invalid_filter(e):
+    return jsonify({"message": f"Filtro inválido: {e}"}), 400
+
+def _columnar_response(stream, mimetype, filename):
+    try:
+        filters = _parse_filters(request.args)
+    except ValueError as e:
+        return _invalid_filter(e)
+    entity = manutencao_entity(filters.get("start_date"))
+    stmt = columnar_select(_filter_criteria(filters, entity), entity)
+    headers = {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
+    }
+    body = stream_with_context(stream(iter_batches(stmt)))
+    return Response(body, mimetype=mimetype, headers=headers)
+
+def _build_excel(manutencoes):
+    # Cria Excel puro com xlsxwriter
+    buf = BytesIO()
+    workbook = xlsxwriter.Workbook(buf, {'in_memory': True})
+    ws = workbook.add_worksheet('Manutenções')
+
+    # Cabeçalho
+    headers = ['ID','Máquina','Frota','Entrada','Saída','Horímetro',
+               'Tipo','Categoria','Específico','Comentário','Responsável','Custo (R$)']
+    for col, h in enumerate(headers):
+        ws.write(0, col, h)
+
+    # Linhas
+    for row_idx, m in enumerate(manutencoes, start=1):
+        values = [
+            m.id,
+            m.maquina.nome if m.maquina else '',
+            m.maquina.numero_frota if m.maquina else '',
+            m.data_entrada.strftime('%d/%m/%Y %H:%M') if m.data_entrada else '',
+            m.data_saida.strftime('%d/%m/%Y %H:%M') if m.data_saida else '',
+            m.horimetro_hodometro or '',
+            m.tipo_manutencao.value if m.tipo_manutencao else '',
+            m.categoria_servico.value if m.categoria_servico else '',
+            m.categoria_outros_especificacao if getattr(m, 'categoria_servico', None) == CategoriaServicoEnum.OUTROS else '',
+            m.comentario or '',
+            m.responsavel_servico or '',
+            m.custo or 0
+        ]
+        for col, val in enumerate(values):
+            ws.write(row_idx, col, val)
+
+    workbook.close()
+    return buf.getvalue()
+
+def _build_pdf(manutencoes):
+    html = "<html><head><meta charset='utf-8'><style>table{border-collapse:collapse;width:100%;}td,th{border:1px solid #ddd;padding:8px;}</style></head><body>"
+    html += "<h2>Relatório de Manutenções</h2><table><thead><tr>"
+    cols = ["Máquina","Frota","Entrada","Saída","Tipo","Categoria","Responsável","Custo"]
+    for c in cols:
+        html += f"<th>{c}</th>"
+    html += "</tr></thead><tbody>"
+    for m in manutencoes:
+        html += (
+            f"<tr><td>{m.maquina.nome}</td>"
+            f"<td>{m.maquina.numero_frota}</td>"
+            f"<td>{m.data_entrada.strftime('%d/%m/%Y')}</td>"
+            f"<td>{m.data_saida.strftime('%d/%m/%Y') if m.data_saida else '-'}</td>"
+            f"<td>{m.tipo_manutencao.value}</td>"
+            f"<td>{m.categoria_servico.value}</td>"
+            f"<td>{m.responsavel_servico}</td>"
+            f"<td>{m.custo or '-'}</td></tr>"
+        )
+    html += "</tbody></table></body></html>"
+
+    # Garante configuração PDFKIT_CONFIG disponível
+    config = current_app.config.get('PDFKIT_CONFIG')
+    if config:
+        return pdfkit.from_string(html, False, configuration=config)
+    return pdfkit.from_string(html, False)
+
+def _send_cached(path, key, mimetype, filename):
+    # ETag = chave do cache; o cliente revalida a cada download
+    resp = send_file(path, mimetype=mimetype, as_attachment=True, download_name=filename,
+                     etag=key, conditional=True)
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    resp.cache_control.max_age = 0
+    return resp
 
 @export_bp.route("/manutencoes/excel", methods=["OPTIONS", "GET"])
 @role_required(["gestor", "administrador"])
+@admission.limit("export")
 def export_manutencoes_excel():
     # Preflight CORS
     if request.method == "OPTIONS":
         return make_response(('', 204))
 
     try:
-        # Busca dados
-        manutencoes = _get_filtered_manutencoes(request.args)
-        if not manutencoes:
-            return jsonify({"message": "Nenhuma manutenção encontrada."}), 404
+        filters = _parse_filters(request.args)
+    except ValueError as e:
+        return _invalid_filter(e)
 
-        # Cria Excel puro com xlsxwriter
-        buf = BytesIO()
-        workbook = xlsxwriter.Workbook(buf, {'in_memory': True})
-        ws = workbook.add_worksheet('Manutenções')
-
-        # Cabeçalho
-        headers = ['ID','Máquina','Frota','Entrada','Saída','Horímetro',
-                   'Tipo','Categoria','Específico','Comentário','Responsável','Custo (R$)']
-        for col, h in enumerate(headers):
-            ws.write(0, col, h)
-
-        # Linhas
-        for row_idx, m in enumerate(manutencoes, start=1):
-            values = [
-                m.id,
-                m.maquina.nome if m.maquina else '',
-                m.maquina.numero_frota if m.maquina else '',
-                m.data_entrada.strftime('%d/%m/%Y %H:%M') if m.data_entrada else '',
-                m.data_saida.strftime('%d/%m/%Y %H:%M') if m.data_saida else '',
-                m.horimetro_hodometro or '',
-                m.tipo_manutencao.value if m.tipo_manutencao else '',
-                m.categoria_servico.value if m.categoria_servico else '',
-                m.categoria_outros_especificacao if getattr(m, 'categoria_servico', None) == CategoriaServicoEnum.OUTROS else '',
-                m.comentario or '',
-                m.responsavel_servico or '',
-                m.custo or 0
-            ]
-            for col, val in enumerate(values):
-                ws.write(row_idx, col, val)
-
-        workbook.close()
-        buf.seek(0)
-        data = buf.getvalue()
-
-        current_app.logger.info(f"Excel gerado com {len(data)} bytes")
-        filename = f"manutencoes.xlsx"
-
-        headers = {
-            "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            "Content-Disposition": f"attachment; filename={filename}",
-            "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
-            "Pragma": "no-cache",
-            "Expires": "0",
-        }
-
-        return Response(data, headers=headers)
+    try:
+        key = export_cache.key("excel", filters)
+        path = export_cache.get(key)
+        if path is None:
+            # Busca dados
+            manutencoes = _get_filtered_manutencoes(filters)
+            if not manutencoes:
+                return jsonify({"message": "Nenhuma manutenção encontrada."}), 404
+            data = _build_excel(manutencoes)
+            current_app.logger.info(f"Excel gerado com {len(data)} bytes")
+            path = export_cache.put(key, data)
+
+        return _send_cached(
+            path, key,
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            "manutencoes.xlsx",
+        )
 
     except Exception as e:
         current_app.logger.exception('Falha ao gerar Excel')
@@ -100,42 +184,41 @@ def export_manutencoes_excel():
 
 @export_bp.route("/manutencoes/pdf", methods=["OPTIONS", "GET"])
 @role_required(["gestor", "administrador"])
+@admission.limit("export")
 def export_manutencoes_pdf():
     # Preflight CORS
     if request.method == "OPTIONS":
         return make_response(('', 204))
 
-    manutencoes = _get_filtered_manutencoes(request.args)
-    if not manutencoes:
-        return jsonify({"message": "Nenhuma manutenção encontrada."}), 404
+    try:
+        filters = _parse_filters(request.args)
+    except ValueError as e:
+        return _invalid_filter(e)
+
+    key = export_cache.key("pdf", filters)
+    path = export_cache.get(key)
+    if path is None:
+        manutencoes = _get_filtered_manutencoes(filters)
+        if not manutencoes:
+            return jsonify({"message": "Nenhuma manutenção encontrada."}), 404
+        path = export_cache.put(key, _build_pdf(manutencoes))
+
+    return _send_cached(path, key, "application/pdf", "relatorio_manutencoes.pdf")
 
-    html = "<html><head><meta charset='utf-8'><style>table{border-collapse:collapse;width:100%;}td,th{border:1px solid #ddd;padding:8px;}</style></head><body>"
-    html += "<h2>Relatório de Manutenções</h2><table><thead><tr>"
-    cols = ["Máquina","Frota","Entrada","Saída","Tipo","Categoria","Responsável","Custo"]
-    for c in cols:
-        html += f"<th>{c}</th>"
-    html += "</tr></thead><tbody>"
-    for m in manutencoes:
-        html += (
-            f"<tr><td>{m.maquina.nome}</td>"
-            f"<td>{m.maquina.numero_frota}</td>"
-            f"<td>{m.data_entrada.strftime('%d/%m/%Y')}</td>"
-            f"<td>{m.data_saida.strftime('%d/%m/%Y') if m.data_saida else '-'}</td>"
-            f"<td>{m.tipo_manutencao.value}</td>"
-            f"<td>{m.categoria_servico.value}</td>"
-            f"<td>{m.responsavel_servico}</td>"
-            f"<td>{m.custo or '-'}</td></tr>"
-        )
-    html += "</tbody></table></body></html>"
+@export_bp.route("/manutencoes/csv", methods=["OPTIONS", "GET"])
+@role_required(["gestor", "administrador"])
+@admission.limit("export")
+def export_manutencoes_csv():
+    # Preflight CORS
+    if request.method == "OPTIONS":
+        return make_response(('', 204))
+    return _columnar_response(stream_csv, "text/csv", "manutencoes.csv")
 
-    from flask import current_app
-    # Garante configuração PDFKIT_CONFIG disponível
-    pdf_bytes = current_app.config.get('PDFKIT_CONFIG') and pdfkit.from_string(html, False, configuration=current_app.config['PDFKIT_CONFIG']) or pdfkit.from_string(html, False)
-    headers = {
-        "Content-Type": "application/pdf",
-        "Content-Disposition": "attachment; filename=relatorio_manutencoes.pdf",
-        "Cache-Control": "no-store, no-cache, must-revalidate, max-age=0",
-        "Pragma": "no-cache",
-        "Expires": "0",
-    }
-    return Response(pdf_bytes, headers=headers)
+@export_bp.route("/manutencoes/parquet", methods=["OPTIONS", "GET"])
+@role_required(["gestor", "administrador"])
+@admission.limit("export")
+def export_manutencoes_parquet():
+    # Preflight CORS
+    if request.method == "OPTIONS":
+        return make_response(('', 204))
+    return _columnar_response(stream_parquet, "application/vnd.apache.parquet", "manutencoes.parquet")
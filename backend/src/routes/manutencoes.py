@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 import logging
 from flask import Blueprint, request, jsonify, current_app
-from src.models.models import db, Manutencao, Maquina, TipoManutencaoEnum, CategoriaServicoEnum
+from src.models.models import db, Manutencao, TipoManutencaoEnum
 from datetime import datetime
+from src.archive import manutencao_entity
+from src.schemas import validate_manutencoes
 from functools import wraps
 
 manutencoes_bp = Blueprint("manutencoes_bp", __name__)
 
+MAX_LOTE = 1000
+
 # Decorator placeholder para simular verificação de role (substituir por real)
 def role_required(role):
     def decorator(f):
@@ -25,82 +29,12 @@ def role_required(role):
 def create_manutencao():
     data = request.get_json() or {}
     current_app.logger.debug('Payload POST /manutencoes: %s', data)
-    errors = {}
     try:
-        # Validação e conversão de campos
-        maquina_id = data.get("maquina_id")
-        if not maquina_id:
-            errors["maquina_id"] = "Máquina é obrigatória."
-        else:
-            maquina = Maquina.query.get(maquina_id)
-            if not maquina:
-                errors["maquina_id"] = "Máquina não encontrada."
-
-        horimetro_hodometro_val = data.get("horimetro_hodometro")
-        try:
-            horimetro_hodometro = float(horimetro_hodometro_val)
-        except (TypeError, ValueError):
-            errors["horimetro_hodometro"] = "Valor inválido para Horímetro/Hodômetro."
-
-        data_entrada_str = data.get("data_entrada")
-        try:
-            data_entrada = datetime.fromisoformat(data_entrada_str.replace("Z", "+00:00")
-                                                   if data_entrada_str.endswith("Z") else data_entrada_str)
-        except Exception:
-            errors["data_entrada"] = "Formato inválido para Data de Entrada."
-
-        data_saida = None
-        data_saida_str = data.get("data_saida")
-        if data_saida_str:
-            try:
-                data_saida = datetime.fromisoformat(data_saida_str.replace("Z", "+00:00")
-                                                   if data_saida_str.endswith("Z") else data_saida_str)
-            except Exception:
-                errors["data_saida"] = "Formato inválido para Data de Saída."
-
-        tipo_manutencao = None
-        tipo_str = data.get("tipo_manutencao")
-        try:
-            tipo_manutencao = TipoManutencaoEnum(tipo_str)
-        except Exception:
-            errors["tipo_manutencao"] = "Valor inválido para Tipo de Manutenção."
-
-        categoria_servico = None
-        categoria_str = data.get("categoria_servico")
-        try:
-            categoria_servico = CategoriaServicoEnum(categoria_str)
-        except Exception:
-            errors["categoria_servico"] = "Valor inválido para Categoria do Serviço."
-
-        responsavel_servico = data.get("responsavel_servico")
-        if not responsavel_servico:
-            errors["responsavel_servico"] = "Responsável pelo Serviço é obrigatório."
-
-        custo = None
-        custo_str = data.get("custo")
-        if custo_str is not None:
-            try:
-                custo = float(custo_str)
-            except Exception:
-                errors["custo"] = "Valor inválido para Custo."
-
-        comentario = data.get("comentario")
-
+        [(values, errors)] = validate_manutencoes([data])
         if errors:
             return jsonify({"message": "Erro de validação", "errors": errors}), 400
 
-        nova = Manutencao(
-            maquina_id=maquina_id,
-            horimetro_hodometro=horimetro_hodometro,
-            data_entrada=data_entrada,
-            data_saida=data_saida,
-            tipo_manutencao=tipo_manutencao,
-            categoria_servico=categoria_servico,
-            categoria_outros_especificacao=data.get("categoria_outros_especificacao"),
-            comentario=comentario,
-            responsavel_servico=responsavel_servico,
-            custo=custo
-        )
+        nova = Manutencao(**values)
         db.session.add(nova)
         db.session.commit()
         return jsonify({"message": "Manutenção registrada com sucesso", "id": nova.id}), 201
@@ -110,20 +44,49 @@ def create_manutencao():
         logging.exception("Erro interno ao criar manutenção")
         return jsonify({"message": "Erro interno ao registrar manutenção. Contate o suporte."}), 500
 
+# Rota para registrar várias manutenções de uma vez (tudo ou nada)
+@manutencoes_bp.route("/manutencoes/lote", methods=["POST"])
+def create_manutencoes_lote():
+    data = request.get_json()
+    if not isinstance(data, list) or not data:
+        return jsonify({"message": "Envie uma lista de manutenções."}), 400
+    if len(data) > MAX_LOTE:
+        return jsonify({"message": f"Lote acima do limite de {MAX_LOTE} manutenções."}), 400
+    try:
+        results = validate_manutencoes(data)
+        errors = {i: errs for i, (_, errs) in enumerate(results) if errs}
+        if errors:
+            return jsonify({"message": "Erro de validação", "errors": errors}), 400
+
+        novas = [Manutencao(**values) for values, _ in results]
+        db.session.add_all(novas)
+        db.session.commit()
+        return jsonify({"message": f"{len(novas)} manutenções registradas com sucesso",
+                        "ids": [m.id for m in novas]}), 201
+
+    except Exception:
+        db.session.rollback()
+        logging.exception("Erro interno ao registrar lote de manutenções")
+        return jsonify({"message": "Erro interno ao registrar manutenções. Contate o suporte."}), 500
+
 # Rota para listar manutenções (com filtros)
 @manutencoes_bp.route("/manutencoes", methods=["GET"])
 def get_manutencoes():
     try:
-        query = Manutencao.query
-        if "maquina_id" in request.args:
-            query = query.filter_by(maquina_id=request.args.get("maquina_id"))
-        if "tipo_manutencao" in request.args:
-            query = query.filter(Manutencao.tipo_manutencao == TipoManutencaoEnum(request.args.get("tipo_manutencao")))
+        sd = ed = None
         if "start_date" in request.args and "end_date" in request.args:
             sd = datetime.fromisoformat(request.args.get("start_date"))
             ed = datetime.fromisoformat(request.args.get("end_date"))
-            query = query.filter(Manutencao.data_entrada.between(sd, ed))
-        muts = query.order_by(Manutencao.data_entrada.desc()).all()
+        # Só une o arquivo histórico quando o período pedido chega nele
+        M = manutencao_entity(sd)
+        query = db.session.query(M)
+        if "maquina_id" in request.args:
+            query = query.filter(M.maquina_id == request.args.get("maquina_id"))
+        if "tipo_manutencao" in request.args:
+            query = query.filter(M.tipo_manutencao == TipoManutencaoEnum(request.args.get("tipo_manutencao")))
+        if sd is not None:
+            query = query.filter(M.data_entrada.between(sd, ed))
+        muts = query.order_by(M.data_entrada.desc()).all()
         result = [
             {
                 "id": m.id,
@@ -150,7 +113,10 @@ def get_manutencoes():
 @manutencoes_bp.route("/manutencoes/<int:id>", methods=["GET"])
 def get_manutencao(id):
     try:
-        m = Manutencao.query.get_or_404(id)
+        m = Manutencao.query.get(id)
+        if m is None:
+            M = manutencao_entity()
+            m = db.session.query(M).filter(M.id == id).first_or_404()
         data = {
             "id": m.id,
             "maquina_id": m.maquina_id,
@@ -175,26 +141,12 @@ def get_manutencao(id):
 def update_manutencao(id):
     data = request.get_json() or {}
     m = Manutencao.query.get_or_404(id)
-    # Atualiza campos permitidos dinamicamente
     try:
-        # Campos simples
-        for field in ["horimetro_hodometro", "data_entrada", "data_saida", "comentario", "responsavel_servico", "custo"]:
-            if field in data:
-                setattr(m, field, data[field])
-
-        # Enum: tipo_manutencao
-        if "tipo_manutencao" in data:
-            try:
-                m.tipo_manutencao = TipoManutencaoEnum(data["tipo_manutencao"])
-            except ValueError:
-                return jsonify({"message": f"Tipo de manutenção inválido: {data['tipo_manutencao']}"}), 400
-
-        # Enum: categoria_servico
-        if "categoria_servico" in data:
-            try:
-                m.categoria_servico = CategoriaServicoEnum(data["categoria_servico"])
-            except ValueError:
-                return jsonify({"message": f"Categoria de serviço inválida: {data['categoria_servico']}"}), 400
+        [(values, errors)] = validate_manutencoes([data], partial=True)
+        if errors:
+            return jsonify({"message": "Erro de validação", "errors": errors}), 400
+        for field, value in values.items():
+            setattr(m, field, value)
 
         db.session.commit()
         return jsonify({"message": "Manutenção atualizada com sucesso"}), 200
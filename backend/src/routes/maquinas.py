@@ -62,8 +62,9 @@ def handle_maquinas():
         except Exception as e:
             return jsonify({"message": f"Erro ao buscar máquinas: {e}"}), 500
 from flask import Blueprint, request, jsonify, abort
-from src.models.models import db, Maquina, TipoMaquinaEnum, TipoControleEnum, StatusMaquinaEnum
-from datetime import datetime
+from src.models.models import db, Maquina
+from src.schemas import MAQUINA, error_message
+from src.timeline import fleet_timeline, maquina_timeline
 from functools import wraps
 
 maquinas_bp = Blueprint("maquinas_bp", __name__)
@@ -83,24 +84,14 @@ def role_required(role):
 @role_required("gestor")
 def handle_maquinas():
     if request.method == "POST":
-        data = request.get_json() or {}
+        values, errors = MAQUINA.validate(request.get_json() or {})
+        if errors:
+            return jsonify({"message": error_message(errors), "errors": errors}), 400
         try:
-            nova_maquina = Maquina(
-                tipo=TipoMaquinaEnum(data["tipo"]),
-                numero_frota=data["numero_frota"],
-                data_aquisicao=datetime.strptime(data["data_aquisicao"], "%Y-%m-%d").date(),
-                tipo_controle=TipoControleEnum(data["tipo_controle"]),
-                nome=data["nome"],
-                marca=data.get("marca"),
-                status=StatusMaquinaEnum(data.get("status", "ativo"))
-            )
+            nova_maquina = Maquina(**values)
             db.session.add(nova_maquina)
             db.session.commit()
             return jsonify({"message": "Máquina criada com sucesso", "id": nova_maquina.id}), 201
-        except KeyError as e:
-            return jsonify({"message": f"Campo obrigatório ausente: {e.args[0]}"}), 400
-        except ValueError as e:
-            return jsonify({"message": f"Valor inválido fornecido: {e}"}), 400
         except Exception as e:
             db.session.rollback()
             return jsonify({"message": f"Erro ao criar máquina: {e}"}), 500
@@ -143,26 +134,14 @@ def handle_maquina(maquina_id):
 
     # PUT/PATCH para atualizar
     if request.method in ("PUT", "PATCH"):
-        data = request.get_json() or {}
+        values, errors = MAQUINA.validate(request.get_json() or {}, partial=True)
+        if errors:
+            return jsonify({"message": error_message(errors), "errors": errors}), 400
         try:
-            if "tipo" in data:
-                maquina.tipo = TipoMaquinaEnum(data["tipo"])
-            if "numero_frota" in data:
-                maquina.numero_frota = data["numero_frota"]
-            if "data_aquisicao" in data:
-                maquina.data_aquisicao = datetime.strptime(data["data_aquisicao"], "%Y-%m-%d").date()
-            if "tipo_controle" in data:
-                maquina.tipo_controle = TipoControleEnum(data["tipo_controle"])
-            if "nome" in data:
-                maquina.nome = data["nome"]
-            if "marca" in data:
-                maquina.marca = data.get("marca")
-            if "status" in data:
-                maquina.status = StatusMaquinaEnum(data.get("status"))
+            for field, value in values.items():
+                setattr(maquina, field, value)
             db.session.commit()
             return jsonify({"message": "Máquina atualizada com sucesso"}), 200
-        except ValueError as e:
-            return jsonify({"message": f"Valor inválido fornecido: {e}"}), 400
         except Exception as e:
             db.session.rollback()
             return jsonify({"message": f"Erro ao atualizar máquina: {e}"}), 500
@@ -178,4 +157,23 @@ def handle_maquina(maquina_id):
             return jsonify({"message": f"Erro ao excluir máquina: {e}"}), 500
 
     # Método não permitido
-    abort(405)
\ No newline at end of file
+    abort(405)
+
+# Linha do tempo de uso/custo da frota inteira (cache até a próxima manutenção)
+@maquinas_bp.route("/maquinas/timeline", methods=["GET"])
+@role_required("gestor")
+def get_frota_timeline():
+    try:
+        return jsonify(fleet_timeline.get()), 200
+    except Exception as e:
+        return jsonify({"message": f"Erro ao calcular linha do tempo: {e}"}), 500
+
+# Linha do tempo de uso/custo de uma máquina
+@maquinas_bp.route("/maquinas/<int:maquina_id>/timeline", methods=["GET"])
+@role_required("gestor")
+def get_maquina_timeline(maquina_id):
+    maquina = Maquina.query.get_or_404(maquina_id)
+    try:
+        return jsonify(maquina_timeline(maquina)), 200
+    except Exception as e:
+        return jsonify({"message": f"Erro ao calcular linha do tempo: {e}"}), 500
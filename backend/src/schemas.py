@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""Schemas declarativos dos payloads de Maquina e Manutencao.
+
+Cada schema é compilado uma vez, na importação, em uma tupla de
+``(campo, parser, obrigatório, default, mensagens)``; os parsers de enum
+usam mapas valor -> membro pré-computados. ``validate`` devolve
+``(valores, erros)`` e é usado pelas rotas unitárias, pelo lote e pela
+importação.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from src.models.models import (
+    db, Maquina, TipoMaquinaEnum, TipoControleEnum, StatusMaquinaEnum,
+    TipoManutencaoEnum, CategoriaServicoEnum,
+)
+
+MISSING = object()
+
+
+# Parsers: recebem o valor bruto e levantam ValueError/TypeError se inválido
+def text(max_length=None):
+    def parse(value):
+        if isinstance(value, bool) or not isinstance(value, (str, int)):
+            raise TypeError(value)
+        value = str(value).strip()
+        if max_length is not None and len(value) > max_length:
+            raise ValueError(value)
+        return value
+    return parse
+
+
+def number(value):
+    if isinstance(value, bool):
+        raise TypeError(value)
+    return float(value)
+
+
+def integer(value):
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(value)
+    return int(value)
+
+
+def iso_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+def iso_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def choice(enum_cls):
+    members = {member.value: member for member in enum_cls}
+    members.update({member: member for member in enum_cls})
+
+    def parse(value):
+        return members[value]
+    return parse
+
+
+class Field:
+    def __init__(self, parse, label, required=False, default=MISSING, required_message=None, invalid_message=None):
+        self.parse = parse
+        self.required = required
+        self.default = default
+        self.required_message = required_message or f"{label} é obrigatório."
+        self.invalid_message = invalid_message or f"Valor inválido para {label}."
+
+
+class Schema:
+    def __init__(self, **fields):
+        self.fields = tuple(fields)
+        self._compiled = tuple(
+            (name, f.parse, f.required, f.default, f.required_message, f.invalid_message)
+            for name, f in fields.items()
+        )
+
+    def validate(self, data, partial=False):
+        """Valida ``data``; com ``partial`` só os campos presentes (PUT/PATCH)."""
+        if not isinstance(data, dict):
+            return {}, {"_payload": "Corpo da requisição inválido."}
+        values, errors = {}, {}
+        for name, parse, required, default, required_message, invalid_message in self._compiled:
+            raw = data.get(name, MISSING)
+            if partial and raw is MISSING:
+                continue
+            if raw is MISSING or raw is None or raw == "":
+                if required:
+                    errors[name] = required_message
+                elif partial and default is not MISSING:
+                    # Em PUT/PATCH vazio não volta ao default: campo com default não aceita nulo
+                    errors[name] = invalid_message
+                elif default is not MISSING:
+                    values[name] = default
+                elif raw is not MISSING:
+                    values[name] = None
+                continue
+            try:
+                values[name] = parse(raw)
+            except (ValueError, TypeError, KeyError, AttributeError):
+                errors[name] = invalid_message
+        return values, errors
+
+
+MAQUINA = Schema(
+    tipo=Field(choice(TipoMaquinaEnum), "Tipo", required=True),
+    numero_frota=Field(text(50), "Número de Frota", required=True),
+    data_aquisicao=Field(iso_date, "Data de Aquisição", required=True,
+                         invalid_message="Formato inválido para Data de Aquisição."),
+    tipo_controle=Field(choice(TipoControleEnum), "Tipo de Controle", required=True),
+    nome=Field(text(100), "Nome", required=True),
+    marca=Field(text(100), "Marca"),
+    status=Field(choice(StatusMaquinaEnum), "Status", default=StatusMaquinaEnum.ATIVO),
+)
+
+MANUTENCAO = Schema(
+    maquina_id=Field(integer, "Máquina", required=True, required_message="Máquina é obrigatória."),
+    horimetro_hodometro=Field(number, "Horímetro/Hodômetro", required=True),
+    data_entrada=Field(iso_datetime, "Data de Entrada", required=True,
+                       invalid_message="Formato inválido para Data de Entrada."),
+    data_saida=Field(iso_datetime, "Data de Saída",
+                     invalid_message="Formato inválido para Data de Saída."),
+    tipo_manutencao=Field(choice(TipoManutencaoEnum), "Tipo de Manutenção", required=True),
+    categoria_servico=Field(choice(CategoriaServicoEnum), "Categoria do Serviço", required=True),
+    categoria_outros_especificacao=Field(text(255), "Especificação"),
+    comentario=Field(text(), "Comentário"),
+    responsavel_servico=Field(text(100), "Responsável pelo Serviço", required=True),
+    custo=Field(number, "Custo"),
+)
+
+
+def error_message(errors):
+    return "Erro de validação: " + " ".join(errors.values())
+
+
+def validate_manutencoes(items, partial=False, oficina_id=None):
+    """Valida uma lista de payloads com uma única consulta de máquinas."""
+    results = [MANUTENCAO.validate(item, partial=partial) for item in items]
+    ids = {values["maquina_id"] for values, _ in results if "maquina_id" in values}
+    if ids:
+        stmt = select(Maquina.id).where(Maquina.id.in_(ids))
+        if oficina_id is not None:
+            stmt = stmt.where(Maquina.oficina_id == oficina_id)
+        existentes = set(db.session.execute(stmt).scalars())
+        ausentes = ids - existentes
+        for values, errors in results:
+            if values.get("maquina_id") in ausentes:
+                errors["maquina_id"] = "Máquina não encontrada."
+    return results
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Manifesto da pasta static montado no startup.
+
+Cada arquivo é indexado uma única vez (tamanho e variantes
+.br/.gz pré-comprimidas), então servir um asset não faz stat no disco.
+Para gerar as variantes: ``python -m src.static_assets [pasta]``.
+"""
+import gzip
+import mimetypes
+import os
+import sys
+from dataclasses import dataclass, field
+
+import brotli
+from flask import Response, request
+from werkzeug.wsgi import wrap_file
+
+VARIANTS = {"br": ".br", "gzip": ".gz"}
+# Só vale a pena pré-comprimir texto
+PRECOMPRESS_EXTENSIONS = {".html", ".js", ".css", ".svg", ".json", ".txt", ".map"}
+
+
+@dataclass
+class _File:
+    path: str
+    size: int
+
+
+@dataclass
+class Asset:
+    mimetype: str
+    identity: _File
+    variants: dict = field(default_factory=dict)
+
+
+def _stat(path):
+    return _File(path=path, size=os.path.getsize(path))
+
+
+def build_manifest(folder):
+    manifest = {}
+    if not os.path.isdir(folder):
+        return manifest
+    for root, _, files in os.walk(folder):
+        names = set(files)
+        for name in files:
+            if name.endswith(tuple(VARIANTS.values())) and name.rsplit(".", 1)[0] in names:
+                continue
+            full = os.path.join(root, name)
+            rel = os.path.relpath(full, folder).replace(os.sep, "/")
+            asset = Asset(
+                mimetype=mimetypes.guess_type(name)[0] or "application/octet-stream",
+                identity=_stat(full),
+            )
+            for encoding, suffix in VARIANTS.items():
+                if name + suffix in names:
+                    asset.variants[encoding] = _stat(full + suffix)
+            manifest[rel] = asset
+    return manifest
+
+
+def serve_asset(asset):
+    encoding = request.accept_encodings.best_match(list(asset.variants)) if asset.variants else None
+    file = asset.variants[encoding] if encoding else asset.identity
+
+    headers = {"Content-Length": str(file.size)}
+    if asset.variants:
+        headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    body = wrap_file(request.environ, open(file.path, "rb"))
+    return Response(body, mimetype=asset.mimetype, headers=headers, direct_passthrough=True)
+
+
+def precompress(folder):
+    """Gera as variantes .br/.gz ao lado dos arquivos de texto."""
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if os.path.splitext(name)[1] not in PRECOMPRESS_EXTENSIONS:
+                continue
+            full = os.path.join(root, name)
+            with open(full, "rb") as f:
+                data = f.read()
+            with open(full + ".br", "wb") as f:
+                f.write(brotli.compress(data, quality=11))
+            with open(full + ".gz", "wb") as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+
+if __name__ == "__main__":
+    precompress(sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(__file__), "static"))
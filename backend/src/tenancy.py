@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""Multi-oficina: cada requisição pertence a uma oficina.
+
+A oficina vem do header ``X-Oficina-Id`` (padrão ``DEFAULT_OFICINA_ID``) e
+precisa existir; id desconhecido devolve 404.
+Toda consulta ORM feita pela sessão compartilhada recebe o critério
+``oficina_id = :oficina`` nos modelos com ``TenantMixin`` (inclusive
+aliases, como o histórico com o arquivo), e objetos novos herdam a oficina
+da requisição. Consultas que precisam enxergar todas as oficinas (login)
+usam ``execution_options(todas_oficinas=True)``. Fora de requisições
+(CLI, threads) não há filtro.
+
+Bancos criados antes desta mudança: ``flask --app src.main migrar-oficinas``.
+"""
+import click
+from flask import g, has_request_context, jsonify, request
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from src.models.models import db, Oficina, TenantMixin, VersaoTabela
+
+TENANT_HEADER = "X-Oficina-Id"
+
+
+def current_oficina_id():
+    if has_request_context():
+        return g.get("oficina_id")
+    return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _filtra_oficina(state):
+    if not state.is_select or state.is_column_load:
+        return
+    oficina_id = current_oficina_id()
+    if oficina_id is None or state.execution_options.get("todas_oficinas", False):
+        return
+    state.statement = state.statement.options(
+        with_loader_criteria(TenantMixin, lambda cls: cls.oficina_id == oficina_id, include_aliases=True)
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _atribui_oficina(session, flush_context, instances):
+    oficina_id = current_oficina_id()
+    if oficina_id is None:
+        return
+    for obj in session.new:
+        if isinstance(obj, TenantMixin) and obj.oficina_id is None:
+            obj.oficina_id = oficina_id
+
+
+# Oficinas já confirmadas neste worker (oficinas não são removidas)
+_oficinas_conhecidas = set()
+
+
+def oficina_exists(oficina_id):
+    if oficina_id in _oficinas_conhecidas:
+        return True
+    if db.session.get(Oficina, oficina_id) is None:
+        return False
+    _oficinas_conhecidas.add(oficina_id)
+    return True
+
+
+def _resolve_oficina(default_id):
+    def resolve():
+        raw = request.headers.get(TENANT_HEADER)
+        if raw is None:
+            g.oficina_id = default_id
+            return None
+        try:
+            oficina_id = int(raw)
+        except ValueError:
+            return jsonify({"message": f"{TENANT_HEADER} inválido: {raw}"}), 400
+        if not oficina_exists(oficina_id):
+            return jsonify({"message": f"Oficina {oficina_id} não encontrada"}), 404
+        g.oficina_id = oficina_id
+        return None
+    return resolve
+
+
+def ensure_default_oficina(default_id):
+    if db.session.get(Oficina, default_id) is None:
+        db.session.add(Oficina(id=default_id, nome="Oficina principal"))
+        db.session.commit()
+
+
+# Tabelas que ganharam oficina_id e índices criados para elas
+_TENANT_TABLES = ("maquina", "manutencao", "manutencao_arquivo", "usuario", "auditoria")
+
+
+def migrate_existing(default_id):
+    """Adiciona oficina_id (valor padrão = oficina principal) em bancos antigos."""
+    db.create_all(bind_key=None)
+    ensure_default_oficina(default_id)
+    engine = db.engine
+    insp = inspect(engine)
+    with engine.begin() as conn:
+        for table in _TENANT_TABLES:
+            if "oficina_id" in {c["name"] for c in insp.get_columns(table)}:
+                continue
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN oficina_id INTEGER NOT NULL "
+                f"DEFAULT {int(default_id)} REFERENCES oficina(id)"
+            ))
+        # No SQLite a unicidade global antiga de numero_frota só sai recriando a tabela
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("ALTER TABLE maquina DROP CONSTRAINT IF EXISTS maquina_numero_frota_key"))
+        # Versões passam a ser por oficina; a tabela só guarda contadores de cache
+        if "oficina_id" not in {c["name"] for c in insp.get_columns("versao_tabela")}:
+            VersaoTabela.__table__.drop(conn)
+            VersaoTabela.__table__.create(conn)
+    for table in _TENANT_TABLES:
+        for index in db.metadata.tables[table].indexes:
+            index.create(engine, checkfirst=True)
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_maquina_oficina_frota "
+                "ON maquina (oficina_id, numero_frota)"
+            ))
+
+
+def init_tenancy(app):
+    default_id = app.config.get("DEFAULT_OFICINA_ID", 1)
+    app.before_request(_resolve_oficina(default_id))
+
+    @app.cli.command("migrar-oficinas")
+    def migrar_oficinas():
+        migrate_existing(default_id)
+        click.echo("Tabelas migradas para multi-oficina.")
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Linha do tempo de uso e custo por máquina.
+
+O uso entre manutenções sai de leituras consecutivas de
+``horimetro_hodometro`` via ``LAG`` particionado por ``maquina_id``; o
+banco devolve as linhas prontas e aqui só viram arrays para gráfico.
+"""
+import threading
+
+from sqlalchemy import case, func, select
+
+from src import data_version
+from src.archive import manutencao_entity
+from src.models.models import db, Maquina, TipoControleEnum
+from src.tenancy import current_oficina_id
+
+UNIDADES = {
+    TipoControleEnum.HORIMETRO: "h",
+    TipoControleEnum.HODOMETRO: "km",
+}
+
+
+def timeline_select(maquina_id=None):
+    M = manutencao_entity()
+    anterior = func.lag(M.horimetro_hodometro).over(
+        partition_by=M.maquina_id,
+        order_by=(M.data_entrada, M.id),
+    )
+    leituras = select(
+        M.id,
+        M.maquina_id,
+        M.data_entrada,
+        M.horimetro_hodometro.label("leitura"),
+        M.custo,
+        (M.horimetro_hodometro - anterior).label("uso"),
+    )
+    if maquina_id is not None:
+        leituras = leituras.where(M.maquina_id == maquina_id)
+    leituras = leituras.subquery()
+
+    return select(
+        leituras.c.maquina_id,
+        leituras.c.data_entrada,
+        leituras.c.leitura,
+        leituras.c.custo,
+        leituras.c.uso,
+        case(
+            (leituras.c.uso > 0, func.coalesce(leituras.c.custo, 0) / leituras.c.uso),
+            else_=None,
+        ).label("custo_por_unidade"),
+    ).order_by(leituras.c.maquina_id, leituras.c.data_entrada, leituras.c.id)
+
+
+def _series(rows, unidade):
+    # Média só sobre intervalos com uso positivo, como custo_por_unidade por linha;
+    # custo_total continua sendo o gasto de todas as manutenções
+    com_uso = [r for r in rows if r.uso and r.uso > 0]
+    uso_total = sum(r.uso for r in com_uso)
+    custo_com_uso = sum(r.custo or 0 for r in com_uso)
+    custo_total = sum(r.custo or 0 for r in rows)
+    return {
+        "unidade": unidade,
+        "datas": [r.data_entrada.isoformat() for r in rows],
+        "leituras": [r.leitura for r in rows],
+        "uso": [r.uso for r in rows],
+        "custo": [r.custo for r in rows],
+        "custo_por_unidade": [r.custo_por_unidade for r in rows],
+        "uso_total": uso_total,
+        "custo_total": custo_total,
+        "custo_por_unidade_medio": custo_com_uso / uso_total if uso_total else None,
+    }
+
+
+def maquina_timeline(maquina):
+    rows = db.session.execute(timeline_select(maquina.id)).all()
+    return {"maquina_id": maquina.id, **_series(rows, UNIDADES[maquina.tipo_controle])}
+
+
+def _fleet_timeline():
+    unidades = dict(db.session.execute(select(Maquina.id, Maquina.tipo_controle)).all())
+    por_maquina = {}
+    for row in db.session.execute(timeline_select()):
+        por_maquina.setdefault(row.maquina_id, []).append(row)
+    return [
+        {"maquina_id": maquina_id, **_series(rows, UNIDADES[unidades[maquina_id]])}
+        for maquina_id, rows in por_maquina.items()
+    ]
+
+
+class FleetTimelineCache:
+    """Resultado da frota, por oficina, guardado até a próxima escrita em manutenções."""
+
+    TABLES = ("manutencao", "maquina")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # oficina_id -> (versões, resultado)
+        data_version.on_change(self.invalidate)
+
+    def get(self):
+        oficina_id = current_oficina_id() or 0
+        versions = data_version.get_versions(db.session, self.TABLES, oficina_id)
+        with self._lock:
+            cached = self._entries.get(oficina_id)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+        value = _fleet_timeline()
+        with self._lock:
+            self._entries[oficina_id] = (versions, value)
+        return value
+
+    def invalidate(self, changes):
+        with self._lock:
+            for table, oficina_id in changes:
+                if table in self.TABLES:
+                    self._entries.pop(oficina_id, None)
+
+
+fleet_timeline = FleetTimelineCache()